@@ -9,8 +9,15 @@
 # et lance le serveur de l'API.
 #
 # @section notes_main Notes
-# - Le serveur écoute par défaut sur le port 8080.
+# - Le serveur écoute par défaut sur le port 8080, uniquement sur `127.0.0.1`. Pour l'exposer sur le
+#   réseau, définir la variable d'environnement `API_HOST` (par exemple `API_HOST=0.0.0.0`).
 # - Assurez-vous que le fichier `swagger.yaml` est correctement configuré.
+# - `swagger.yaml` est converti une fois en `swagger.json` (régénéré s'il est plus ancien que le YAML),
+#   que Connexion charge plus rapidement au démarrage.
+# - L'interface Swagger UI et l'exposition de la spécification sont désactivées.
+# - Le serveur WSGI waitress est utilisé s'il est installé (8 threads), sinon le serveur de
+#   développement de Flask. Les données étant conservées en mémoire, l'application doit tourner dans
+#   un seul processus : plusieurs workers gunicorn auraient chacun leur propre copie des données.
 #
 # @section copyright_main Copyright
 # Copyright (c) 2024 UQAC. Tous droits réservés.
@@ -24,6 +31,8 @@
 # @section dependances_main Dépendances/Modules
 # - connexion : Framework pour créer des APIs REST.
 # - swagger_server.encoder : Fournit un encodeur JSON personnalisé pour gérer les données.
+# - yaml / orjson : Conversion de la spécification YAML en JSON.
+# - waitress (optionnel) : Serveur WSGI de production.
 #
 # @section auteur_main Auteur(s)
 # - Jessy / Yasmine
@@ -31,31 +40,123 @@
 #
 # @section todo_main TODO
 # - Ajouter des validations supplémentaires.
-# - Implémenter des tests unitaires pour les endpoints.
 ##
 
 # Importation des modules nécessaires
+import os
+
 import connexion  # @note Framework pour créer des APIs RESTful à partir de spécifications Swagger
+import orjson
+import yaml
 from swagger_server import encoder  # @note Codeur JSON personnalisé pour gérer les réponses API
 
 ##
-# @brief Lance l'application de gestion de contenu de cours.
-# @details Configure et démarre une application Connexion pour exposer l'API décrite dans swagger.yaml.
+# @var SPECIFICATION_DIR
+# Répertoire contenant la spécification Swagger, à côté de ce fichier (là où Connexion la cherche),
+# quel que soit le répertoire courant.
+##
+SPECIFICATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'swagger')
+
+##
+# @var SPEC_YAML
+# Spécification Swagger source.
+##
+SPEC_YAML = 'swagger.yaml'
+
+##
+# @var SPEC_JSON
+# Copie JSON de `SPEC_YAML`, générée par `build_spec_cache`.
+##
+SPEC_JSON = 'swagger.json'
+
+##
+# @var HOST
+# Adresse d'écoute du serveur (variable d'environnement `API_HOST`, `127.0.0.1` par défaut).
+##
+HOST = os.environ.get('API_HOST', '127.0.0.1')
+
+##
+# @brief Convertir la spécification YAML en JSON.
+# @details Évite à Connexion d'analyser le YAML à chaque démarrage (et à chaque rechargement en mode debug).
+# Les clés non textuelles du YAML (codes de réponse `200:` non entre guillemets, dates) sont converties
+# en chaînes, comme les attend Connexion. La spécification est sérialisée avant toute écriture, puis
+# écrite dans un fichier temporaire renommé sur `swagger.json` : en cas d'échec, aucun `swagger.json`
+# vide ou partiel n'est laissé. Si `swagger.json` ne peut pas être écrit (déploiement en lecture
+# seule), Connexion charge directement `swagger.yaml`.
 #
-# @note Le serveur écoute sur le port 8080 par défaut.
+# @return str Le nom du fichier de spécification à charger, relatif à `SPECIFICATION_DIR`.
 ##
-def main():
-    # Initialisation de l'application Connexion
-    app = connexion.App(__name__, specification_dir='./swagger/')
-    
+def build_spec_cache() -> str:
+    with open(os.path.join(SPECIFICATION_DIR, SPEC_YAML), 'rb') as f:
+        spec = yaml.safe_load(f)
+    buf = orjson.dumps(spec, option=orjson.OPT_NON_STR_KEYS)
+
+    json_path = os.path.join(SPECIFICATION_DIR, SPEC_JSON)
+    tmp = json_path + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(buf)
+        os.replace(tmp, json_path)
+    except OSError:
+        return SPEC_YAML
+    return SPEC_JSON
+
+##
+# @brief Choisir le fichier de spécification à charger.
+# @details Utilise `swagger.json` s'il n'est pas vide et au moins aussi récent que `swagger.yaml`, sinon le régénère.
+#
+# @return str Le nom du fichier de spécification, relatif à `SPECIFICATION_DIR`.
+##
+def spec_file() -> str:
+    yaml_path = os.path.join(SPECIFICATION_DIR, SPEC_YAML)
+    json_path = os.path.join(SPECIFICATION_DIR, SPEC_JSON)
+    if not os.path.exists(yaml_path):
+        return SPEC_JSON
+    if (os.path.exists(json_path) and os.path.getsize(json_path) > 0
+            and os.path.getmtime(json_path) >= os.path.getmtime(yaml_path)):
+        return SPEC_JSON
+    return build_spec_cache()
+
+##
+# @brief Construire l'application de gestion de contenu de cours.
+# @details Configure une application Connexion exposant l'API décrite dans la spécification Swagger.
+#
+# @return connexion.FlaskApp L'application configurée.
+##
+def create_app() -> connexion.FlaskApp:
+    # Initialisation de l'application Connexion, sans Swagger UI ni exposition de la spécification
+    app = connexion.FlaskApp(__name__, specification_dir=SPECIFICATION_DIR,
+                             options={'swagger_ui': False, 'serve_spec': False})
+
     # Définir l'encodeur JSON personnalisé
     app.app.json_encoder = encoder.JSONEncoder
-    
+
     # Ajouter les spécifications Swagger
-    app.add_api('swagger.yaml', arguments={'title': 'API de Gestion de Contenu de Cours'})
-    
+    app.add_api(spec_file(), arguments={'title': 'API de Gestion de Contenu de Cours'})
+    return app
+
+##
+# @var app
+# Application construite au chargement du module.
+##
+app = create_app()
+
+##
+# @brief Lance l'application de gestion de contenu de cours.
+# @details Démarre l'application Connexion construite par `create_app` avec waitress, ou avec le
+# serveur de développement si waitress n'est pas installé.
+#
+# @note Le serveur écoute sur `HOST`, port 8080, avec les deux serveurs.
+##
+def main():
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(host=HOST, port=8080)
+        return
+
     # Démarrer le serveur
-    app.run(port=8080)
+    serve(app.app, host=HOST, port=8080, threads=8)
 
 
 ##
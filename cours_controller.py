@@ -22,8 +22,9 @@
 #
 # @section dependances_cours_controller Dépendances/Modules
 # - connexion : Framework pour gérer les APIs REST.
-# - json : Module standard pour manipuler les fichiers JSON.
-# - os : Utilisé pour vérifier l'existence du fichier de données.
+# - orjson : Sérialisation des réponses.
+# - swagger_server.data_store : Lecture et écriture partagées du fichier de données.
+# - swagger_server.util : Construction des réponses JSON déjà sérialisées.
 #
 # @section auteur_cours_controller Auteur(s)
 # - Jessy / Yasmine
@@ -31,21 +32,17 @@
 #
 # @section todo_cours_controller TODO
 # - Ajouter une validation des données d'entrée.
-# - Implémenter des tests unitaires pour chaque endpoint.
 ##
 
 import connexion
-import json
-import os
-from typing import Dict, Tuple, Union
+import flask
+import orjson
 
-## Constantes globales
-##
-# @var DATA_FILE
-# Chemin vers le fichier JSON contenant les données des cours.
-##
-DATA_FILE = "data.json"
+from swagger_server.data_store import (DB_LOCK, append_op, find_course_by_id, get_db, index_course, mutation_gen,
+                                       unindex_course)
+from swagger_server.util import json_response
 
+## Constantes globales
 ##
 # @var COURSE_NOT_FOUND
 # Message renvoyé si le cours n'existe pas.
@@ -58,107 +55,118 @@ COURSE_NOT_FOUND = {"message": "Cours non trouvé."}
 ##
 COURSE_ALREADY_EXISTS = {"message": "Un cours avec cet ID existe déjà."}
 
-## Fonctions principales
+##
+# @var _COURSE_NOT_FOUND_BODY
+# `COURSE_NOT_FOUND` sérialisé une seule fois, au chargement du module.
+##
+_COURSE_NOT_FOUND_BODY = orjson.dumps(COURSE_NOT_FOUND)
 
 ##
-# @brief Charger les données depuis le fichier JSON.
-# @details Si le fichier JSON est absent ou corrompu, retourne une structure de données par défaut.
-# 
-# @return dict Les données chargées ou un dictionnaire par défaut.
+# @var _COURSE_ALREADY_EXISTS_BODY
+# `COURSE_ALREADY_EXISTS` sérialisé une seule fois, au chargement du module.
 ##
-def load_data() -> Dict:
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {"cours": []}
-    return {"cours": []}
+_COURSE_ALREADY_EXISTS_BODY = orjson.dumps(COURSE_ALREADY_EXISTS)
 
 ##
-# @brief Sauvegarder les données dans le fichier JSON.
-# @details Écrit les données JSON dans le fichier `data.json`.
-#
-# @param data dict Les données à sauvegarder.
+# @var _GET_CACHE
+# Dernière réponse sérialisée de `courses_get`, avec la génération des données qu'elle reflète.
 ##
-def save_data(data: Dict) -> None:
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+_GET_CACHE = {"gen": -1, "body": None}
+
+## Fonctions principales
 
 ##
 # @brief Obtenir la liste des cours.
-# @details Retourne tous les cours stockés dans le fichier JSON.
+# @details Retourne tous les cours stockés ; les données en mémoire ont déjà la forme `{"cours": [...]}`.
+# La réponse sérialisée est réutilisée tant qu'aucune modification n'a eu lieu.
 # 
-# @return tuple(dict, int) Liste des cours et code HTTP 200.
+# @return Response Liste des cours et code HTTP 200.
 ##
-def courses_get() -> Tuple[Dict, int]:
-    data = load_data()
-    return {"cours": data["cours"]}, 200
+def courses_get() -> flask.Response:
+    with DB_LOCK:
+        data = get_db()
+        if _GET_CACHE["gen"] != mutation_gen():
+            _GET_CACHE["body"] = orjson.dumps(data)
+            _GET_CACHE["gen"] = mutation_gen()
+        return json_response(_GET_CACHE["body"], 200)
 
 ##
 # @brief Créer un nouveau cours.
 # @details Ajoute un cours à la base de données si l'ID est unique.
 #
-# @return tuple(dict, int) Message de succès ou d'erreur, et code HTTP.
+# @return Response Message de succès ou d'erreur, et code HTTP.
 ##
-def courses_post() -> Tuple[Dict, int]:
+def courses_post() -> flask.Response:
     course_data = connexion.request.get_json()
-    data = load_data()
-    
-    if any(course['id'] == course_data.get('id') for course in data['cours']):
-        return COURSE_ALREADY_EXISTS, 400
+    with DB_LOCK:
+        data = get_db()
 
-    data['cours'].append(course_data)
-    save_data(data)
-    return {"message": "Cours créé avec succès.", "cours": course_data}, 201
+        if find_course_by_id(course_data.get('id')) is not None:
+            return json_response(_COURSE_ALREADY_EXISTS_BODY, 400)
+
+        data['cours'].append(course_data)
+        index_course(course_data)
+        append_op("add_course", course_data)
+        return json_response(orjson.dumps({"message": "Cours créé avec succès.", "cours": course_data}), 201)
 
 ##
 # @brief Obtenir les détails d'un cours spécifique.
 # @details Recherche un cours par son ID et retourne ses détails s'il existe.
 #
 # @param course_id int L'ID du cours recherché.
-# @return tuple(dict, int) Détails du cours ou message d'erreur.
+# @return Response Détails du cours ou message d'erreur.
 ##
-def courses_course_id_get(course_id: int) -> Tuple[Dict, int]:
-    data = load_data()
-    course = next((c for c in data['cours'] if c['id'] == course_id), None)
-    if not course:
-        return COURSE_NOT_FOUND, 404
-    return course, 200
+def courses_course_id_get(course_id: int) -> flask.Response:
+    with DB_LOCK:
+        get_db()
+        course = find_course_by_id(course_id)
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
+        return json_response(orjson.dumps(course), 200)
 
 ##
 # @brief Mettre à jour un cours.
-# @details Modifie les données d'un cours existant par son ID.
+# @details Modifie les données d'un cours existant par son ID. Le nouvel ID éventuel ne doit pas
+# être déjà utilisé par un autre cours.
 #
 # @param course_id int L'ID du cours à mettre à jour.
-# @return tuple(dict, int) Message de succès ou d'erreur.
+# @return Response Message de succès ou d'erreur.
 ##
-def courses_course_id_put(course_id: int) -> Tuple[Dict, int]:
+def courses_course_id_put(course_id: int) -> flask.Response:
     course_data = connexion.request.get_json()
-    data = load_data()
-    course = next((c for c in data['cours'] if c['id'] == course_id), None)
-    
-    if not course:
-        return COURSE_NOT_FOUND, 404
+    with DB_LOCK:
+        get_db()
+        course = find_course_by_id(course_id)
+
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
 
-    course.update(course_data)
-    save_data(data)
-    return {"message": "Cours mis à jour avec succès.", "cours": course}, 200
+        new_id = course_data.get('id', course_id)
+        if new_id != course_id and find_course_by_id(new_id) is not None:
+            return json_response(_COURSE_ALREADY_EXISTS_BODY, 400)
+
+        unindex_course(course_id)
+        course.update(course_data)
+        index_course(course)
+        append_op("update_course", {"id": course_id, "cours": course})
+        return json_response(orjson.dumps({"message": "Cours mis à jour avec succès.", "cours": course}), 200)
 
 ##
 # @brief Supprimer un cours.
 # @details Supprime un cours par son ID si celui-ci existe.
 #
 # @param course_id int L'ID du cours à supprimer.
-# @return tuple(dict, int) Message de succès ou d'erreur.
-##
-def courses_course_id_delete(course_id: int) -> Tuple[Dict, int]:
-    data = load_data()
-    course = next((c for c in data['cours'] if c['id'] == course_id), None)
-    
-    if not course:
-        return COURSE_NOT_FOUND, 404
-    
-    data['cours'].remove(course)
-    save_data(data)
-    return {"message": "Cours supprimé avec succès."}, 200
+# @return Response Message de succès ou d'erreur.
+##
+def courses_course_id_delete(course_id: int) -> flask.Response:
+    with DB_LOCK:
+        data = get_db()
+        course = find_course_by_id(course_id)
+
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
+
+        data['cours'].remove(course)
+        unindex_course(course_id)
+        append_op("delete_course", {"id": course_id})
+        return json_response(orjson.dumps({"message": "Cours supprimé avec succès."}), 200)
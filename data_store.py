@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+
+##
+# @file data_store.py
+# @brief Accès partagé au fichier de données des cours et séances.
+# @details Ce fichier centralise la lecture et l'écriture des données pour les contrôleurs des cours
+# et des séances. Les données sont stockées sous forme d'un instantané `data.json` complété par un
+# journal `data.jsonl` où chaque modification est ajoutée sur une ligne, ce qui évite de réécrire tout
+# le fichier à chaque requête. Les données sont lues une seule fois au premier accès puis la copie en
+# mémoire fait foi, avec des index permettant de retrouver un cours ou une séance par son ID. Les
+# écritures sur le disque sont faites par un thread dédié, sans bloquer les requêtes.
+#
+# @section dependances_data_store Dépendances/Modules
+# - orjson : Analyse et sérialisation JSON rapides.
+# - os : Écriture atomique de l'instantané et troncature du journal.
+# - queue : File des écritures en attente pour le thread d'écriture.
+# - threading : Thread d'écriture et protection des données en mémoire contre les accès concurrents.
+# - atexit : Vide la file des écritures à l'arrêt du serveur.
+# - logging : Signale les écritures sur le disque qui échouent.
+#
+# @section auteur_data_store Auteur(s)
+# - Jessy / Yasmine
+# - Date : 20 / 11 / 2024
+##
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from typing import Dict, List, Union
+
+import orjson
+
+## Constantes globales
+##
+# @var _LOGGER
+# Journal des erreurs du module.
+##
+_LOGGER = logging.getLogger(__name__)
+
+##
+# @var DATA_FILE
+# Chemin vers le fichier JSON contenant l'instantané des cours et séances.
+##
+DATA_FILE = "data.json"
+
+##
+# @var JOURNAL_FILE
+# Chemin vers le journal JSONL des modifications appliquées depuis le dernier instantané.
+##
+JOURNAL_FILE = "data.jsonl"
+
+##
+# @var JOURNAL_MAX_SIZE
+# Taille (en octets) au-delà de laquelle le journal est fusionné dans l'instantané.
+##
+JOURNAL_MAX_SIZE = 1024 * 1024
+
+##
+# @var _DB
+# Données en mémoire faisant foi, chargées depuis le disque au premier appel de `get_db`.
+##
+_DB = None
+
+##
+# @var _SEQ
+# Numéro de la dernière opération journalisée. Chaque ligne du journal porte son numéro et
+# l'instantané celui de la dernière opération qu'il contient (clé `seq`).
+##
+_SEQ = 0
+
+##
+# @var _MUTATION_GEN
+# Compteur incrémenté à chaque modification des données, permettant aux contrôleurs d'invalider
+# les réponses qu'ils mettent en cache.
+##
+_MUTATION_GEN = 0
+
+##
+# @var _COURSE_INDEX
+# Index des cours des données en cache : ID du cours -> cours.
+##
+_COURSE_INDEX = {}
+
+##
+# @var _SESSIONS_BY_COURSE
+# Index des séances des données en cache : ID du cours -> {ID de la séance -> séance}.
+##
+_SESSIONS_BY_COURSE = {}
+
+##
+# @var _SESSIONS_LIST_BY_COURSE
+# Séances de chaque cours, tous modules confondus et dans leur ordre : ID du cours -> liste de séances.
+##
+_SESSIONS_LIST_BY_COURSE = {}
+
+##
+# @var DB_LOCK
+# Verrou protégeant `_DB` et les index, Connexion pouvant servir plusieurs requêtes en parallèle.
+# Les contrôleurs le gardent pendant tout le traitement d'une requête (lecture, modification,
+# journalisation et sérialisation de la réponse) ; il est réentrant pour que les fonctions de ce
+# module puissent l'acquérir à nouveau.
+##
+DB_LOCK = threading.RLock()
+
+##
+# @var _QUEUE
+# File des lignes du journal en attente d'écriture (ou `_COMPACT`).
+##
+_QUEUE = queue.Queue()
+
+##
+# @var _COMPACT
+# Élément de `_QUEUE` demandant la réécriture de l'instantané.
+##
+_COMPACT = None
+
+##
+# @var _WRITER
+# Thread d'écriture, démarré à la première écriture.
+##
+_WRITER = None
+
+##
+# @var _fdatasync
+# `os.fdatasync` lorsqu'il est disponible, `os.fsync` sinon (Windows, macOS).
+##
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+## Fonctions principales
+
+##
+# @brief Reconstruire les index des cours et des séances.
+# @details Appelée à chaque fois que les données sont lues depuis le disque.
+#
+# @param data dict Les données contenant la liste des cours.
+##
+def _build_indexes(data: Dict) -> None:
+    _COURSE_INDEX.clear()
+    _SESSIONS_BY_COURSE.clear()
+    _SESSIONS_LIST_BY_COURSE.clear()
+    for course in data['cours']:
+        index_course(course)
+
+##
+# @brief Rejouer une opération du journal sur les données.
+# @details Les index doivent déjà correspondre à `data` ; ils sont mis à jour au fil de l'opération.
+#
+# @param data dict Les données à modifier.
+# @param op str Le type d'opération (`add_course`, `update_course`, `delete_course`, `add_session`, `update_session`).
+# @param payload dict Les données associées à l'opération.
+##
+def _apply_op(data: Dict, op: str, payload: Dict) -> None:
+    if op == "add_course":
+        data['cours'].append(payload)
+        index_course(payload)
+    elif op == "update_course":
+        course = find_course_by_id(payload['id'])
+        if course is not None:
+            unindex_course(payload['id'])
+            course.clear()
+            course.update(payload['cours'])
+            index_course(course)
+    elif op == "delete_course":
+        course = find_course_by_id(payload['id'])
+        if course is not None:
+            data['cours'].remove(course)
+            unindex_course(payload['id'])
+    elif op == "add_session":
+        course = find_course_by_id(payload['course_id'])
+        if course is not None:
+            add_session_to_course(course, payload['seance'])
+            index_session(payload['course_id'], payload['seance'])
+    elif op == "update_session":
+        session = find_session_by_id(payload['course_id'], payload['id'])
+        if session is not None:
+            unindex_session(payload['course_id'], payload['id'])
+            session.clear()
+            session.update(payload['seance'])
+            index_session(payload['course_id'], session)
+
+##
+# @brief Charger les données depuis l'instantané et le journal.
+# @details Lit l'instantané puis rejoue les opérations du journal, et reconstruit les index. Les lignes
+# dont le numéro (`seq`) ne dépasse pas celui de l'instantané, ou d'une ligne déjà rejouée, sont déjà
+# prises en compte et sont ignorées. Si
+# l'instantané est absent ou corrompu, part d'une structure de données par défaut. Une dernière ligne
+# du journal sans saut de ligne (arrêt brutal pendant une écriture) est ignorée et retirée du fichier,
+# pour que les lignes ajoutées ensuite restent lisibles. Une ligne complète mais illisible est signalée
+# et ignorée, sans toucher aux lignes qui la suivent.
+# Réservée à `get_db` : les index globaux sont reconstruits pour les données retournées.
+#
+# @return dict Les données chargées ou un dictionnaire par défaut.
+##
+def load_data() -> Dict:
+    global _SEQ
+    data = {"cours": []}
+    try:
+        with open(DATA_FILE, 'rb') as f:
+            data = orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        pass
+    _SEQ = data.pop('seq', 0)
+    _build_indexes(data)
+
+    try:
+        f = open(JOURNAL_FILE, 'rb')
+    except FileNotFoundError:
+        return data
+
+    valid_size = 0
+    with f:
+        journal_size = os.fstat(f.fileno()).st_size
+        for line_no, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                break
+            valid_size += len(line)
+            if not line.strip():
+                continue
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                _LOGGER.error("Ligne %d du journal %s illisible, ignorée.", line_no, JOURNAL_FILE)
+                continue
+            seq = entry.get('seq', 0)
+            if not seq or seq > _SEQ:
+                _apply_op(data, entry['op'], entry['payload'])
+                _SEQ = max(_SEQ, seq)
+    if valid_size < journal_size:
+        os.truncate(JOURNAL_FILE, valid_size)
+    return data
+
+##
+# @brief Obtenir les données en mémoire.
+# @details Charge les données depuis le disque au premier appel uniquement ; les appels suivants
+# retournent le même dictionnaire, que les contrôleurs modifient directement.
+#
+# @return dict Les données faisant foi.
+##
+def get_db() -> Dict:
+    global _DB, _MUTATION_GEN
+    if _DB is None:
+        with DB_LOCK:
+            if _DB is None:
+                _DB = load_data()
+                _MUTATION_GEN += 1
+    return _DB
+
+##
+# @brief Écrire l'instantané et vider le journal.
+# @details Appelée uniquement depuis le thread d'écriture. L'instantané est sérialisé sous `DB_LOCK`
+# avec le numéro `_SEQ` de la dernière opération qu'il contient, écrit dans un fichier temporaire puis
+# renommé sur `DATA_FILE` : un arrêt brutal pendant l'écriture laisse l'ancien instantané intact.
+# Le journal est ensuite vidé sans synchronisation ; après un arrêt brutal entre le renommage et ce
+# vidage, il contient encore des lignes déjà incluses dans l'instantané. Il en va de même pour les
+# lignes encore en file au moment de l'instantané, écrites ensuite dans le journal vidé. Dans les deux
+# cas, leur numéro permet à `load_data` de ne pas les rejouer.
+##
+def _write_snapshot() -> None:
+    with DB_LOCK:
+        buf = orjson.dumps(dict(_DB, seq=_SEQ), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    tmp = DATA_FILE + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(fd, view):]
+        _fdatasync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, DATA_FILE)
+
+    with open(JOURNAL_FILE, 'wb'):
+        pass
+
+##
+# @brief Ajouter des lignes à la fin du journal.
+# @details Les lignes sont écrites en une seule fois. Si l'écriture échoue en cours de route (disque
+# plein), le journal est tronqué à sa taille initiale pour ne pas laisser de ligne partielle, et les
+# lignes pourront être réécrites telles quelles. Si le journal ne se termine pas par un saut de ligne
+# (troncature elle-même impossible lors d'un échec précédent), un saut de ligne est ajouté d'abord afin
+# que la ligne partielle reste isolée et n'entame pas la première ligne ajoutée.
+#
+# @param lines list Les lignes sérialisées, chacune terminée par un saut de ligne.
+# @return int La taille du journal après l'écriture.
+##
+def _append_journal(lines: List[bytes]) -> int:
+    fd = os.open(JOURNAL_FILE, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        start = os.lseek(fd, 0, os.SEEK_END)
+        buf = b"".join(lines)
+        if start:
+            os.lseek(fd, start - 1, os.SEEK_SET)
+            if os.read(fd, 1) != b"\n":
+                buf = b"\n" + buf
+        try:
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view):]
+        except OSError:
+            os.ftruncate(fd, start)
+            raise
+        return start + len(buf)
+    finally:
+        os.close(fd)
+
+##
+# @brief Boucle du thread d'écriture.
+# @details Attend un élément puis retire tous ceux déjà en attente, de sorte que des modifications
+# rapprochées ne donnent lieu qu'à une seule écriture sur le disque. L'instantané est réécrit si le lot
+# le demande ou si le journal dépasse `JOURNAL_MAX_SIZE`. Si une écriture échoue (disque plein, droits,
+# chemin invalide), l'erreur est journalisée et elle est retentée avec le lot suivant : les lignes qui
+# n'ont pas atteint le journal restent en attente, dans l'ordre, et la réécriture de l'instantané
+# reste demandée jusqu'à ce qu'elle réussisse.
+##
+def _writer_loop() -> None:
+    pending = []
+    compact = False
+    while True:
+        items = [_QUEUE.get()]
+        while True:
+            try:
+                items.append(_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        lines = [item for item in items if item is not _COMPACT]
+        pending.extend(lines)
+        compact = compact or len(lines) < len(items)
+        try:
+            if pending:
+                journal_size = _append_journal(pending)
+                pending = []
+                compact = compact or journal_size > JOURNAL_MAX_SIZE
+            if compact:
+                _write_snapshot()
+                compact = False
+        except Exception:
+            _LOGGER.exception("Échec de l'écriture des données ; nouvel essai à la prochaine modification.")
+        finally:
+            for _ in items:
+                _QUEUE.task_done()
+
+##
+# @brief Ajouter un élément à la file d'écriture.
+# @details Démarre le thread d'écriture s'il ne tourne pas (encore ou plus). Doit être appelée avec
+# `DB_LOCK` acquis.
+#
+# @param item bytes|None Une ligne du journal ou `_COMPACT`.
+##
+def _enqueue(item) -> None:
+    global _WRITER
+    if _WRITER is None or not _WRITER.is_alive():
+        _WRITER = threading.Thread(target=_writer_loop, name="data_store-writer", daemon=True)
+        _WRITER.start()
+    _QUEUE.put(item)
+
+##
+# @brief Attendre que toutes les écritures en attente aient été traitées.
+# @details Enregistrée avec `atexit` pour ne rien perdre à l'arrêt du serveur. Rend la main dès que
+# la file est vide ou si le thread d'écriture ne tourne pas ; un lot dont l'écriture a échoué reste
+# en attente dans le thread d'écriture jusqu'à la modification suivante.
+##
+def flush() -> None:
+    with _QUEUE.all_tasks_done:
+        while _QUEUE.unfinished_tasks:
+            if _WRITER is None or not _WRITER.is_alive():
+                return
+            _QUEUE.all_tasks_done.wait(0.1)
+
+atexit.register(flush)
+
+##
+# @brief Forcer la compaction : réécrire l'instantané et vider le journal.
+# @details Point d'entrée explicite de la compaction, en dehors du seuil `JOURNAL_MAX_SIZE`. Si `data`
+# n'est pas le dictionnaire en mémoire, il le remplace (et les index sont reconstruits). L'écriture est
+# faite de manière asynchrone par le thread d'écriture ; appeler `flush` pour l'attendre. Les
+# contrôleurs n'en ont pas besoin : ils enregistrent chaque modification avec `append_op`.
+#
+# @param data dict Les données à sauvegarder, en général celles retournées par `get_db`.
+##
+def save_data(data: Dict) -> None:
+    global _DB, _MUTATION_GEN
+    with DB_LOCK:
+        _MUTATION_GEN += 1
+        if data is not _DB:
+            _build_indexes(data)
+            _DB = data
+        _enqueue(_COMPACT)
+
+##
+# @brief Ajouter une opération au journal.
+# @details Les données en mémoire doivent déjà refléter l'opération. La ligne reçoit le numéro
+# d'opération suivant et est sérialisée immédiatement sous `DB_LOCK`, puis écrite par le thread
+# d'écriture ; lorsque le journal dépasse `JOURNAL_MAX_SIZE`, il est fusionné dans l'instantané.
+#
+# @param op str Le type d'opération (voir `_apply_op`).
+# @param payload dict Les données associées à l'opération.
+##
+def append_op(op: str, payload: Dict) -> None:
+    global _MUTATION_GEN, _SEQ
+    with DB_LOCK:
+        _SEQ += 1
+        _MUTATION_GEN += 1
+        _enqueue(orjson.dumps({"seq": _SEQ, "op": op, "payload": payload}, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+
+##
+# @brief Obtenir le numéro de génération des données.
+# @details Change à chaque appel de `append_op` ou `save_data`, et à chaque chargement des données
+# depuis le disque.
+#
+# @return int Le nombre de modifications enregistrées depuis le démarrage.
+##
+def mutation_gen() -> int:
+    return _MUTATION_GEN
+
+##
+# @brief Trouver un cours par son ID.
+# @details Recherche le cours dans l'index des données en mémoire.
+#
+# @param course_id int L'ID du cours à rechercher.
+# @return dict|None Le cours correspondant à l'ID ou None.
+##
+def find_course_by_id(course_id: int) -> Union[Dict, None]:
+    return _COURSE_INDEX.get(course_id)
+
+##
+# @brief Trouver une séance par son ID dans un cours donné.
+# @details Recherche la séance dans l'index des données en mémoire.
+#
+# @param course_id int L'ID du cours contenant la séance.
+# @param session_id int L'ID de la séance à rechercher.
+# @return dict|None La séance correspondante ou None.
+##
+def find_session_by_id(course_id: int, session_id: int) -> Union[Dict, None]:
+    return _SESSIONS_BY_COURSE.get(course_id, {}).get(session_id)
+
+##
+# @brief Obtenir les séances d'un cours.
+# @details Retourne la liste précalculée des séances de tous les modules du cours.
+#
+# @param course_id int L'ID du cours.
+# @return list Les séances du cours (liste vide si le cours n'existe pas).
+##
+def get_course_sessions(course_id: int) -> List[Dict]:
+    return _SESSIONS_LIST_BY_COURSE.get(course_id, [])
+
+##
+# @brief Recalculer la liste des séances d'un cours.
+#
+# @param course dict Le cours dont les séances sont listées.
+##
+def _list_sessions(course: Dict) -> None:
+    _SESSIONS_LIST_BY_COURSE[course.get('id')] = [session for module in course.get('modules', [])
+                                                  for session in module.get('seances', [])]
+
+##
+# @brief Ajouter une séance au premier module d'un cours.
+# @details Crée un module par défaut si le cours n'en a pas encore. Les index ne sont pas mis à jour
+# (voir `index_session`).
+#
+# @param course dict Le cours auquel ajouter la séance.
+# @param session dict La séance à ajouter.
+##
+def add_session_to_course(course: Dict, session: Dict) -> None:
+    if not course.get('modules'):
+        course['modules'] = [{"id": "module_1", "titre": "Nouveau module", "seances": []}]
+    course['modules'][0]['seances'].append(session)
+
+##
+# @brief Ajouter un cours et ses séances aux index.
+#
+# @param course dict Le cours à indexer.
+##
+def index_course(course: Dict) -> None:
+    _COURSE_INDEX[course.get('id')] = course
+    _list_sessions(course)
+    _SESSIONS_BY_COURSE[course.get('id')] = {session.get('id'): session
+                                             for session in _SESSIONS_LIST_BY_COURSE[course.get('id')]}
+
+##
+# @brief Retirer un cours et ses séances des index.
+#
+# @param course_id int L'ID du cours à retirer.
+##
+def unindex_course(course_id: int) -> None:
+    _COURSE_INDEX.pop(course_id, None)
+    _SESSIONS_BY_COURSE.pop(course_id, None)
+    _SESSIONS_LIST_BY_COURSE.pop(course_id, None)
+
+##
+# @brief Ajouter une séance à l'index.
+# @details La séance doit déjà figurer dans un module du cours ; la liste des séances du cours est recalculée.
+#
+# @param course_id int L'ID du cours contenant la séance.
+# @param session dict La séance à indexer.
+##
+def index_session(course_id: int, session: Dict) -> None:
+    _SESSIONS_BY_COURSE.setdefault(course_id, {})[session.get('id')] = session
+    _list_sessions(_COURSE_INDEX[course_id])
+
+##
+# @brief Retirer une séance de l'index.
+#
+# @param course_id int L'ID du cours contenant la séance.
+# @param session_id int L'ID de la séance à retirer.
+##
+def unindex_session(course_id: int, session_id: int) -> None:
+    _SESSIONS_BY_COURSE.get(course_id, {}).pop(session_id, None)
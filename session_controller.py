@@ -24,8 +24,9 @@
 #
 # @section dependances_session_controller Dépendances/Modules
 # - connexion : Framework pour gérer les APIs REST.
-# - json : Module standard pour manipuler les fichiers JSON.
-# - os : Utilisé pour vérifier l'existence du fichier de données.
+# - orjson : Sérialisation des réponses.
+# - swagger_server.data_store : Lecture et écriture partagées du fichier de données.
+# - swagger_server.util : Construction des réponses JSON déjà sérialisées.
 #
 # @section auteur_session_controller Auteur(s)
 # - Jessy / Yasmine
@@ -34,22 +35,19 @@
 # @section todo_session_controller TODO
 # - Ajouter des validations plus strictes pour les données d'entrée.
 # - Implémenter un endpoint pour supprimer une séance.
-# - Ajouter des tests unitaires.
 ##
 
 # Importation des modules nécessaires
 import connexion
-import json
-import os
-from typing import Dict, Tuple, Union
+import flask
+import orjson
 
-## Constantes globales
-##
-# @var DATA_FILE
-# Chemin vers le fichier JSON contenant les données des cours et séances.
-##
-DATA_FILE = "data.json"
+from swagger_server.data_store import (DB_LOCK, add_session_to_course, append_op, find_course_by_id,
+                                       find_session_by_id, get_course_sessions, get_db, index_session,
+                                       mutation_gen, unindex_session)
+from swagger_server.util import json_response
 
+## Constantes globales
 ##
 # @var COURSE_NOT_FOUND
 # Message renvoyé si le cours n'existe pas.
@@ -69,137 +67,123 @@ SESSION_NOT_FOUND = {"message": "Séance non trouvée."}
 SESSION_ALREADY_EXISTS = {"message": "Une séance avec cet ID existe déjà dans le cours."}
 
 ##
-# @var SESSION_CREATED_SUCCESS
-# Message de succès renvoyé lors de la création d'une séance.
+# @var _COURSE_NOT_FOUND_BODY
+# `COURSE_NOT_FOUND` sérialisé une seule fois, au chargement du module.
 ##
-SESSION_CREATED_SUCCESS = "Séance créée avec succès."
+_COURSE_NOT_FOUND_BODY = orjson.dumps(COURSE_NOT_FOUND)
 
 ##
-# @var SESSION_UPDATED_SUCCESS
-# Message de succès renvoyé lors de la mise à jour d'une séance.
+# @var _SESSION_NOT_FOUND_BODY
+# `SESSION_NOT_FOUND` sérialisé une seule fois, au chargement du module.
 ##
-SESSION_UPDATED_SUCCESS = "Séance mise à jour avec succès."
-
-## Fonctions principales
+_SESSION_NOT_FOUND_BODY = orjson.dumps(SESSION_NOT_FOUND)
 
 ##
-# @brief Charger les données depuis le fichier JSON.
-# @details Si le fichier JSON est absent ou corrompu, retourne une structure de données par défaut.
-# 
-# @return dict Les données chargées ou un dictionnaire par défaut.
+# @var _SESSION_ALREADY_EXISTS_BODY
+# `SESSION_ALREADY_EXISTS` sérialisé une seule fois, au chargement du module.
 ##
-def load_data() -> Dict:
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {"cours": []}
-    return {"cours": []}
+_SESSION_ALREADY_EXISTS_BODY = orjson.dumps(SESSION_ALREADY_EXISTS)
 
 ##
-# @brief Sauvegarder les données dans le fichier JSON.
-# @details Écrit les données JSON dans le fichier `data.json`.
-#
-# @param data dict Les données à sauvegarder.
+# @var SESSION_CREATED_SUCCESS
+# Message de succès renvoyé lors de la création d'une séance.
 ##
-def save_data(data: Dict) -> None:
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+SESSION_CREATED_SUCCESS = "Séance créée avec succès."
 
 ##
-# @brief Trouver un cours par son ID.
-# @details Recherche un cours dans les données en fonction de son ID.
-#
-# @param data dict Les données contenant la liste des cours.
-# @param course_id int L'ID du cours à rechercher.
-# @return dict|None Le cours correspondant à l'ID ou None.
+# @var SESSION_UPDATED_SUCCESS
+# Message de succès renvoyé lors de la mise à jour d'une séance.
 ##
-def find_course_by_id(data: Dict, course_id: int) -> Union[Dict, None]:
-    return next((course for course in data['cours'] if course['id'] == course_id), None)
+SESSION_UPDATED_SUCCESS = "Séance mise à jour avec succès."
 
 ##
-# @brief Trouver une séance par son ID dans un cours donné.
-# @details Recherche une séance spécifique dans les modules d'un cours.
-#
-# @param course dict Le cours contenant les modules et séances.
-# @param session_id int L'ID de la séance à rechercher.
-# @return dict|None La séance correspondante ou None.
+# @var _SESSIONS_GET_CACHE
+# Réponses sérialisées de `courses_course_id_sessions_get` par ID de cours, valables pour la génération
+# des données indiquée.
 ##
-def find_session_by_id(course: Dict, session_id: int) -> Union[Dict, None]:
-    for module in course.get('modules', []):
-        for session in module.get('seances', []):
-            if session['id'] == session_id:
-                return session
-    return None
+_SESSIONS_GET_CACHE = {"gen": -1, "bodies": {}}
+
+## Fonctions principales
 
 ##
 # @brief Obtenir les séances d'un cours.
-# @details Retourne toutes les séances associées aux modules d'un cours spécifique.
+# @details Retourne toutes les séances associées aux modules d'un cours spécifique. La réponse sérialisée
+# est réutilisée tant qu'aucune modification n'a eu lieu.
 #
 # @param course_id int L'ID du cours.
-# @return tuple(dict, int) Liste des séances et un code de statut HTTP.
+# @return Response Liste des séances et un code de statut HTTP.
 ##
-def courses_course_id_sessions_get(course_id: int) -> Tuple[Dict, int]:
-    data = load_data()
-    course = find_course_by_id(data, course_id)
+def courses_course_id_sessions_get(course_id: int) -> flask.Response:
+    with DB_LOCK:
+        get_db()
+        course = find_course_by_id(course_id)
 
-    if not course:
-        return COURSE_NOT_FOUND, 404
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
 
-    sessions = []
-    for module in course.get('modules', []):
-        sessions.extend(module.get('seances', []))
-    
-    return {"seances": sessions}, 200
+        if _SESSIONS_GET_CACHE["gen"] != mutation_gen():
+            _SESSIONS_GET_CACHE["bodies"] = {}
+            _SESSIONS_GET_CACHE["gen"] = mutation_gen()
+
+        body = _SESSIONS_GET_CACHE["bodies"].get(course_id)
+        if body is None:
+            body = orjson.dumps({"seances": get_course_sessions(course_id)})
+            _SESSIONS_GET_CACHE["bodies"][course_id] = body
+        return json_response(body, 200)
 
 ##
 # @brief Créer une nouvelle séance pour un cours.
 # @details Ajoute une nouvelle séance à un cours existant. Si une séance avec le même ID existe déjà, retourne une erreur.
 #
 # @param course_id int L'ID du cours.
-# @return tuple(dict, int) Message de succès ou d'erreur et un code de statut HTTP.
+# @return Response Message de succès ou d'erreur et un code de statut HTTP.
 ##
-def courses_course_id_sessions_post(course_id: int) -> Tuple[Dict, int]:
-    data = load_data()
-    course = find_course_by_id(data, course_id)
-
-    if not course:
-        return COURSE_NOT_FOUND, 404
-
+def courses_course_id_sessions_post(course_id: int) -> flask.Response:
     session_data = connexion.request.get_json()
+    with DB_LOCK:
+        get_db()
+        course = find_course_by_id(course_id)
+
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
 
-    if any(find_session_by_id(course, session_data['id']) for module in course['modules']):
-        return SESSION_ALREADY_EXISTS, 400
+        if find_session_by_id(course_id, session_data['id']) is not None:
+            return json_response(_SESSION_ALREADY_EXISTS_BODY, 400)
 
-    if not course.get('modules'):
-        course['modules'] = [{"id": "module_1", "titre": "Nouveau module", "seances": []}]
-    
-    course['modules'][0]['seances'].append(session_data)
-    save_data(data)
-    return {"message": SESSION_CREATED_SUCCESS, "seance": session_data}, 201
+        add_session_to_course(course, session_data)
+        index_session(course_id, session_data)
+        append_op("add_session", {"course_id": course_id, "seance": session_data})
+        return json_response(orjson.dumps({"message": SESSION_CREATED_SUCCESS, "seance": session_data}), 201)
 
 ##
 # @brief Mettre à jour une séance.
-# @details Modifie les données d'une séance existante. Si la séance ou le cours n'existe pas, retourne une erreur.
+# @details Modifie les données d'une séance existante. Si la séance ou le cours n'existe pas, ou si le nouvel ID
+# est déjà utilisé par une autre séance du cours, retourne une erreur.
 #
 # @param course_id int L'ID du cours.
 # @param session_id int L'ID de la séance à mettre à jour.
-# @return tuple(dict, int) Message de succès ou d'erreur et un code de statut HTTP.
+# @return Response Message de succès ou d'erreur et un code de statut HTTP.
 ##
-def courses_course_id_sessions_session_id_put(course_id: int, session_id: int) -> Tuple[Dict, int]:
-    data = load_data()
-    course = find_course_by_id(data, course_id)
+def courses_course_id_sessions_session_id_put(course_id: int, session_id: int) -> flask.Response:
+    session_data = connexion.request.get_json()
+    with DB_LOCK:
+        get_db()
+        course = find_course_by_id(course_id)
 
-    if not course:
-        return COURSE_NOT_FOUND, 404
+        if not course:
+            return json_response(_COURSE_NOT_FOUND_BODY, 404)
 
-    session_data = connexion.request.get_json()
-    session = find_session_by_id(course, session_id)
+        session = find_session_by_id(course_id, session_id)
+
+        if not session:
+            return json_response(_SESSION_NOT_FOUND_BODY, 404)
 
-    if not session:
-        return SESSION_NOT_FOUND, 404
+        new_id = session_data.get('id', session_id)
+        if new_id != session_id and find_session_by_id(course_id, new_id) is not None:
+            return json_response(_SESSION_ALREADY_EXISTS_BODY, 400)
 
-    session.update(session_data)
-    save_data(data)
-    return {"message": SESSION_UPDATED_SUCCESS, "seance": session}, 200
+        unindex_session(course_id, session_id)
+        session.update(session_data)
+        index_session(course_id, session)
+        append_op("update_session", {"course_id": course_id, "id": session_id, "seance": session})
+        return json_response(orjson.dumps({"message": SESSION_UPDATED_SUCCESS, "seance": session}), 200)
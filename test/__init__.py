@@ -0,0 +1,39 @@
+import logging
+import os
+import shutil
+import tempfile
+
+import connexion
+from flask_testing import TestCase
+
+from swagger_server import data_store
+from swagger_server.encoder import JSONEncoder
+
+
+class BaseTestCase(TestCase):
+
+    def create_app(self):
+        logging.getLogger('connexion.operation').setLevel('ERROR')
+        app = connexion.App(__name__, specification_dir='../swagger/', options={'swagger_ui': False})
+        app.app.json_encoder = JSONEncoder
+        app.add_api('swagger.yaml')
+        return app.app
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self._files = (data_store.DATA_FILE, data_store.JOURNAL_FILE)
+        data_store.DATA_FILE = os.path.join(self.tmpdir, "data.json")
+        data_store.JOURNAL_FILE = os.path.join(self.tmpdir, "data.jsonl")
+        data_store._DB = None
+
+    def tearDown(self):
+        data_store.flush()
+        data_store.DATA_FILE, data_store.JOURNAL_FILE = self._files
+        data_store._DB = None
+        shutil.rmtree(self.tmpdir)
+
+    def reload(self):
+        """Drops the in-memory data and loads it again from disk."""
+        data_store.flush()
+        data_store._DB = None
+        return data_store.get_db()
@@ -0,0 +1,125 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import os
+
+from flask import json
+
+from swagger_server import data_store
+from swagger_server.cours_controller import COURSE_ALREADY_EXISTS, COURSE_NOT_FOUND
+from swagger_server.test import BaseTestCase
+
+
+class TestCoursController(BaseTestCase):
+    """CoursController integration test stubs"""
+
+    def post_course(self, course):
+        return self.client.open('/courses', method='POST', data=json.dumps(course),
+                                content_type='application/json')
+
+    def test_courses_get(self):
+        """Test case for courses_get
+
+        The cached list follows every modification.
+        """
+        response = self.client.open('/courses', method='GET')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, {"cours": []})
+
+        self.post_course({"id": 1, "titre": "A"})
+        response = self.client.open('/courses', method='GET')
+        self.assertEqual(response.json, {"cours": [{"id": 1, "titre": "A"}]})
+
+        self.client.open('/courses/1', method='PUT', data=json.dumps({"titre": "B"}),
+                         content_type='application/json')
+        response = self.client.open('/courses', method='GET')
+        self.assertEqual(response.json, {"cours": [{"id": 1, "titre": "B"}]})
+
+        self.client.open('/courses/1', method='DELETE')
+        response = self.client.open('/courses', method='GET')
+        self.assertEqual(response.json, {"cours": []})
+
+    def test_courses_get_after_reload(self):
+        """Test case for courses_get
+
+        The cached list is not reused once the data is loaded again from disk.
+        """
+        self.post_course({"id": 1})
+        self.client.open('/courses', method='GET')
+        data_store.flush()
+        os.remove(data_store.JOURNAL_FILE)
+        self.reload()
+
+        response = self.client.open('/courses', method='GET')
+        self.assertEqual(response.json, {"cours": []})
+
+    def test_courses_post(self):
+        """Test case for courses_post
+
+        Créer un nouveau cours
+        """
+        response = self.post_course({"id": 1, "titre": "A"})
+        self.assertStatus(response, 201, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json["cours"], {"id": 1, "titre": "A"})
+
+        response = self.post_course({"id": 1, "titre": "B"})
+        self.assert400(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json, COURSE_ALREADY_EXISTS)
+
+    def test_courses_course_id_get(self):
+        """Test case for courses_course_id_get
+
+        Obtenir les détails d'un cours
+        """
+        self.post_course({"id": 1, "titre": "A"})
+        response = self.client.open('/courses/1', method='GET')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, {"id": 1, "titre": "A"})
+
+        response = self.client.open('/courses/2', method='GET')
+        self.assert404(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json, COURSE_NOT_FOUND)
+
+    def test_courses_course_id_put(self):
+        """Test case for courses_course_id_put
+
+        An id change that collides with another course is rejected.
+        """
+        self.post_course({"id": 1, "titre": "a"})
+        self.post_course({"id": 2, "titre": "b"})
+
+        response = self.client.open('/courses/2', method='PUT', data=json.dumps({"id": 1}),
+                                    content_type='application/json')
+        self.assert400(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, COURSE_ALREADY_EXISTS)
+
+        self.client.open('/courses/1', method='DELETE')
+        response = self.client.open('/courses/2', method='GET')
+        self.assertEqual(response.json, {"id": 2, "titre": "b"})
+
+        response = self.client.open('/courses/2', method='PUT', data=json.dumps({"id": 3}),
+                                    content_type='application/json')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assert404(self.client.open('/courses/2', method='GET'))
+        self.assert200(self.client.open('/courses/3', method='GET'))
+
+    def test_courses_course_id_delete(self):
+        """Test case for courses_course_id_delete
+
+        Supprimer un cours
+        """
+        self.post_course({"id": 1})
+        response = self.client.open('/courses/1', method='DELETE')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+
+        response = self.client.open('/courses/1', method='DELETE')
+        self.assert404(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, COURSE_NOT_FOUND)
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
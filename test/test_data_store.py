@@ -0,0 +1,203 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import errno
+import os
+import queue
+import threading
+from unittest import mock
+
+from flask import json
+
+from swagger_server import data_store
+from swagger_server.test import BaseTestCase
+
+
+class TestDataStore(BaseTestCase):
+    """DataStore journal, replay and compaction tests"""
+
+    def send(self, path, method, body):
+        """Sends a JSON body to the API and checks that it was accepted."""
+        response = self.client.open(path, method=method, data=json.dumps(body), content_type='application/json')
+        self.assertIn(response.status_code, (200, 201), 'Response body is : ' + response.data.decode('utf-8'))
+
+    def add_course(self, course):
+        self.send('/courses', 'POST', course)
+
+    def update_course(self, course_id, course_data):
+        self.send('/courses/{course_id}'.format(course_id=course_id), 'PUT', course_data)
+
+    def add_session(self, course_id, session):
+        self.send('/courses/{course_id}/sessions'.format(course_id=course_id), 'POST', session)
+
+    def update_session(self, course_id, session_id, session_data):
+        self.send('/courses/{course_id}/sessions/{session_id}'.format(course_id=course_id, session_id=session_id),
+                  'PUT', session_data)
+
+    def test_replay_journal(self):
+        """Test case for rebuilding the data from the journal"""
+        self.add_course({"id": 1, "titre": "A"})
+        self.add_course({"id": 2, "titre": "B"})
+        self.update_course(1, {"id": 3})
+
+        data = self.reload()
+        self.assertEqual(data, {"cours": [{"id": 3, "titre": "A"}, {"id": 2, "titre": "B"}]})
+        self.assertEqual(data_store.find_course_by_id(3), {"id": 3, "titre": "A"})
+        self.assertIsNone(data_store.find_course_by_id(1))
+
+    def test_torn_journal_tail(self):
+        """Test case for ignoring and truncating an incomplete last journal line"""
+        self.add_course({"id": 1})
+        data_store.flush()
+        with open(data_store.JOURNAL_FILE, 'ab') as f:
+            f.write(b'{"op":"add_cou')
+
+        self.assertEqual(self.reload(), {"cours": [{"id": 1}]})
+        self.add_course({"id": 2})
+        self.assertEqual(self.reload(), {"cours": [{"id": 1}, {"id": 2}]})
+
+    def test_corrupt_journal_line(self):
+        """Test case for skipping an unreadable journal line followed by valid ones"""
+        self.add_course({"id": 1})
+        data_store.flush()
+        with open(data_store.JOURNAL_FILE, 'ab') as f:
+            f.write(b'{"op":"add_cou\n')
+        self.add_course({"id": 2})
+
+        with self.assertLogs(data_store.__name__, level='ERROR'):
+            self.assertEqual([course["id"] for course in self.reload()["cours"]], [1, 2])
+        self.add_course({"id": 3})
+        with self.assertLogs(data_store.__name__, level='ERROR'):
+            self.assertEqual([course["id"] for course in self.reload()["cours"]], [1, 2, 3])
+
+    def test_line_queued_during_compaction(self):
+        """Test case for a journal line written after a snapshot that already contains it"""
+        queued = []
+        enqueue = data_store._enqueue
+        data_store._enqueue = queued.append
+        try:
+            self.add_course({"id": 1})
+            self.add_session(1, {"id": 10})
+            self.update_course(1, {"titre": "B"})
+            self.update_session(1, 10, {"id": 11})
+            self.update_course(1, {"id": 2})
+        finally:
+            data_store._enqueue = enqueue
+        data_store._write_snapshot()
+        with data_store.DB_LOCK:
+            for line in queued:
+                data_store._enqueue(line)
+
+        expected = {"cours": [{"id": 2, "titre": "B",
+                               "modules": [{"id": "module_1", "titre": "Nouveau module", "seances": [{"id": 11}]}]}]}
+        self.assertEqual(self.reload(), expected)
+        self.assertEqual(data_store.find_session_by_id(2, 11), {"id": 11})
+
+    def test_crash_before_journal_truncation(self):
+        """Test case for a snapshot written while the previous journal was left in place"""
+        self.add_course({"id": 1})
+        self.add_session(1, {"id": 10})
+        self.update_session(1, 10, {"id": 11})
+        self.update_course(1, {"id": 2})
+        data_store.flush()
+        with open(data_store.JOURNAL_FILE, 'rb') as f:
+            journal = f.read()
+
+        data_store._write_snapshot()
+        with open(data_store.JOURNAL_FILE, 'wb') as f:
+            f.write(journal)
+
+        data = self.reload()
+        self.assertEqual([course["id"] for course in data["cours"]], [2])
+        self.assertEqual(data_store.get_course_sessions(2), [{"id": 11}])
+        self.assertNotIn("seq", data)
+
+        self.add_course({"id": 3})
+        self.assertEqual([course["id"] for course in self.reload()["cours"]], [2, 3])
+
+    def test_save_data_compacts(self):
+        """Test case for save_data rewriting the snapshot and emptying the journal"""
+        self.add_course({"id": 1})
+        self.add_course({"id": 2})
+        data_store.save_data(data_store.get_db())
+        data_store.flush()
+
+        self.assertEqual(os.path.getsize(data_store.JOURNAL_FILE), 0)
+        self.assertEqual(self.reload(), {"cours": [{"id": 1}, {"id": 2}]})
+
+    def test_failed_write_is_retried(self):
+        """Test case for the writer thread surviving a failed write"""
+        self.add_course({"id": 1})
+        data_store.flush()
+        journal_file = data_store.JOURNAL_FILE
+        data_store.JOURNAL_FILE = os.path.join(self.tmpdir, "missing", "data.jsonl")
+        try:
+            with self.assertLogs(data_store.__name__, level='ERROR'):
+                self.add_course({"id": 2})
+                flusher = threading.Thread(target=data_store.flush)
+                flusher.start()
+                flusher.join(5)
+            self.assertFalse(flusher.is_alive())
+            self.assertTrue(data_store._WRITER.is_alive())
+        finally:
+            data_store.JOURNAL_FILE = journal_file
+
+        self.add_course({"id": 3})
+        self.assertEqual([course["id"] for course in self.reload()["cours"]], [1, 2, 3])
+
+    def test_torn_write_is_rolled_back(self):
+        """Test case for a journal append that fails halfway through"""
+        self.add_course({"id": 1})
+        data_store.flush()
+        write, calls = os.write, []
+
+        def torn_write(fd, buf):
+            calls.append(buf)
+            if len(calls) == 1:
+                return write(fd, buf[:len(buf) // 2])
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+        with mock.patch('os.write', torn_write), self.assertLogs(data_store.__name__, level='ERROR'):
+            self.add_course({"id": 2})
+            data_store.flush()
+
+        self.add_course({"id": 3})
+        self.assertEqual([course["id"] for course in self.reload()["cours"]], [1, 2, 3])
+        with open(data_store.JOURNAL_FILE, 'rb') as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_failed_snapshot_is_retried(self):
+        """Test case for journal lines written once while the snapshot keeps failing"""
+        with mock.patch.object(data_store, 'JOURNAL_MAX_SIZE', 0), \
+                mock.patch.object(data_store, '_write_snapshot', side_effect=OSError(errno.EACCES, "denied")), \
+                self.assertLogs(data_store.__name__, level='ERROR'):
+            for course_id in range(5):
+                self.add_course({"id": course_id})
+                data_store.flush()
+            with open(data_store.JOURNAL_FILE, 'rb') as f:
+                self.assertEqual(len(f.readlines()), 5)
+
+        self.add_course({"id": 5})
+        data_store.flush()
+        self.assertEqual(os.path.getsize(data_store.JOURNAL_FILE), 0)
+        self.assertEqual([course["id"] for course in self.reload()["cours"]], [0, 1, 2, 3, 4, 5])
+
+    def test_flush_without_writer(self):
+        """Test case for flush returning when the writer thread is not running"""
+        writer, pending = data_store._WRITER, data_store._QUEUE
+        data_store._WRITER = threading.Thread(target=lambda: None)
+        data_store._QUEUE = queue.Queue()
+        try:
+            data_store._QUEUE.put(b"")
+            flusher = threading.Thread(target=data_store.flush)
+            flusher.start()
+            flusher.join(5)
+            self.assertFalse(flusher.is_alive())
+        finally:
+            data_store._WRITER, data_store._QUEUE = writer, pending
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
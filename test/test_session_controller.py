@@ -0,0 +1,95 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+from flask import json
+
+from swagger_server.session_controller import COURSE_NOT_FOUND, SESSION_ALREADY_EXISTS, SESSION_NOT_FOUND
+from swagger_server.test import BaseTestCase
+
+
+class TestSessionController(BaseTestCase):
+    """SessionController integration test stubs"""
+
+    def setUp(self):
+        super(TestSessionController, self).setUp()
+        self.client.open('/courses', method='POST', data=json.dumps({"id": 1}),
+                         content_type='application/json')
+
+    def post_session(self, course_id, session):
+        return self.client.open('/courses/{course_id}/sessions'.format(course_id=course_id), method='POST',
+                                data=json.dumps(session), content_type='application/json')
+
+    def put_session(self, course_id, session_id, session):
+        return self.client.open('/courses/{course_id}/sessions/{session_id}'.format(course_id=course_id,
+                                                                                    session_id=session_id),
+                                method='PUT', data=json.dumps(session), content_type='application/json')
+
+    def test_courses_course_id_sessions_get(self):
+        """Test case for courses_course_id_sessions_get
+
+        The cached list follows every modification.
+        """
+        response = self.client.open('/courses/1/sessions', method='GET')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, {"seances": []})
+
+        self.post_session(1, {"id": 10})
+        response = self.client.open('/courses/1/sessions', method='GET')
+        self.assertEqual(response.json, {"seances": [{"id": 10}]})
+
+        self.put_session(1, 10, {"titre": "A"})
+        response = self.client.open('/courses/1/sessions', method='GET')
+        self.assertEqual(response.json, {"seances": [{"id": 10, "titre": "A"}]})
+
+        response = self.client.open('/courses/2/sessions', method='GET')
+        self.assert404(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, COURSE_NOT_FOUND)
+
+    def test_courses_course_id_sessions_post(self):
+        """Test case for courses_course_id_sessions_post
+
+        Créer une nouvelle séance pour un cours
+        """
+        response = self.post_session(1, {"id": 10})
+        self.assertStatus(response, 201, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json["seance"], {"id": 10})
+        response = self.client.open('/courses/1', method='GET')
+        self.assertEqual(response.json["modules"],
+                         [{"id": "module_1", "titre": "Nouveau module", "seances": [{"id": 10}]}])
+
+        response = self.post_session(1, {"id": 10})
+        self.assert400(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json, SESSION_ALREADY_EXISTS)
+
+        response = self.post_session(2, {"id": 10})
+        self.assert404(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, COURSE_NOT_FOUND)
+
+    def test_courses_course_id_sessions_session_id_put(self):
+        """Test case for courses_course_id_sessions_session_id_put
+
+        An id change that collides with another session of the course is rejected.
+        """
+        self.post_session(1, {"id": 10})
+        self.post_session(1, {"id": 11})
+
+        response = self.put_session(1, 11, {"id": 10})
+        self.assert400(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, SESSION_ALREADY_EXISTS)
+        response = self.client.open('/courses/1/sessions', method='GET')
+        self.assertEqual(response.json, {"seances": [{"id": 10}, {"id": 11}]})
+
+        response = self.put_session(1, 11, {"id": 12})
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assert404(self.put_session(1, 11, {}))
+
+        response = self.put_session(1, 13, {"titre": "A"})
+        self.assert404(response, 'Response body is : ' + response.data.decode('utf-8'))
+        self.assertEqual(response.json, SESSION_NOT_FOUND)
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()